@@ -1,4 +1,5 @@
 import numpy as np
+from waveform_corpus import open_corpus
 
 #nuradiomc dah dah dah
 
@@ -14,16 +15,16 @@ ch_data[0,81]=128-32
 ch_data[1,80]=128+32
 ch_data[1,81]=128-32
 
-if False:
-    ch0_data=np.loadtxt("data/ch0_test_trace.txt")+128
-    ch1_data=np.loadtxt("data/ch1_test_trace.txt")+128
-    ch2_data=np.loadtxt("data/ch2_test_trace.txt")+128
-    ch3_data=np.loadtxt("data/ch3_test_trace.txt")+128
+#replay a recorded/simulated event instead, see waveform_corpus.py
+corpus=None #e.g. "data/corpus"
+corpus_event=0
 
-    ch0_data=np.pad(ch0_data,pad_width=(0,1024-len(ch0_data)),constant_values=128).astype(int)
-    ch1_data=np.pad(ch1_data,pad_width=(0,1024-len(ch1_data)),constant_values=128).astype(int)
-    ch2_data=np.pad(ch2_data,pad_width=(0,1024-len(ch2_data)),constant_values=128).astype(int)
-    ch3_data=np.pad(ch3_data,pad_width=(0,1024-len(ch3_data)),constant_values=128).astype(int)
+if corpus is not None:
+    index,waveforms=open_corpus(corpus)
+    #anything the corpus doesn't cover stays at baseline
+    ev=waveforms[corpus_event,:4,:2048]
+    ch_data[:]=128
+    ch_data[:ev.shape[0],:ev.shape[1]]=ev
 
 
 print(len(ch_data))
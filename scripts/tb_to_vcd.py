@@ -0,0 +1,178 @@
+import os
+import sys
+import shutil
+import argparse
+import subprocess
+
+#convert the testbench text dumps (data/event_top_tb.txt, data/waveform_tb.txt, data/ram_tb.txt) to vcd for gtkwave/surfer
+#first line is the header with the signal names, then one line per clock of whitespace separated std_logic(_vector)s
+#lines are streamed, only the last value of each column is kept and only changes get written
+
+#columns the testbenches fill with the clock count, same as the vcd time so they're dropped by default
+counter_names=("clk","clk_counter")
+
+#std_logic to vcd 4-state
+value_map=str.maketrans("UXW-ZLHuxwzlh","xxxxz01xxxz01")
+
+def vcd_ids(n):
+    """
+    n short identifiers out of the printable ascii range, like simulators make
+    """
+    ids=[]
+    for i in range(n):
+        s=""
+        i+=1
+        while i>0:
+            i-=1
+            s+=chr(33+i%94)
+            i//=94
+        ids.append(s)
+    return ids
+
+def compact(v):
+    """
+    drop leading zeros from a vector value, vcd left-extends with 0 (or with x/z if that's the top bit)
+    """
+    c=v.lstrip("0")
+    if c=="":
+        return "0"
+    if c[0] in "xz" and len(c)<len(v):
+        return "0"+c
+    return c
+
+def column_names(header,n_cols):
+    """
+    names from the header row, extra columns the header doesn't cover get col<N>, repeats get a suffix
+    """
+    names=header.split()[:n_cols]
+    names+=[f"col{i}" for i in range(len(names),n_cols)]
+    seen={}
+    for i,name in enumerate(names):
+        if name in seen:
+            seen[name]+=1
+            names[i]=f"{name}_{seen[name]}"
+        else:
+            seen[name]=0
+    return names
+
+def convert(fin,fout,period=4,timescale="1 ns",scope="tb",drop=(),keep_counter=False):
+    """
+    stream a testbench dump from fin into vcd on fout, one line of the dump is one period.
+    multi-bit columns become [N-1:0] buses, columns named in drop are left out, as is the clock counter column
+    unless keep_counter. returns the number of lines converted
+    """
+    header=fin.readline()
+    line=fin.readline()
+    lineno=2 #physical line of the file, for messages
+    while line and not line.strip():
+        line=fin.readline()
+        lineno+=1
+    first=line.split()
+    if len(first)==0:
+        raise ValueError("no data after header")
+    #the header can name fewer columns than there are (event_top_tb.txt) but never more
+    if len(first)<len(header.split()):
+        raise ValueError(f"line {lineno} has {len(first)} columns but the header names {len(header.split())}")
+    first_lineno=lineno
+
+    widths=[len(v) for v in first]
+    names=column_names(header,len(widths))
+    for name in drop:
+        if name not in names:
+            print(f"--drop {name} doesn't match any column, columns are {' '.join(names)}",file=sys.stderr)
+    drop=list(drop)
+    #the counter is only dropped while it really is the line count, checked as lines go by
+    counter=None
+    if not keep_counter:
+        for i,name in enumerate(names):
+            if name in counter_names and name not in drop:
+                counter=i
+                drop.append(name)
+                break
+    keep=[i for i,name in enumerate(names) if name not in drop]
+    ids=[None]*len(widths)
+    for i,id in zip(keep,vcd_ids(len(keep))):
+        ids[i]=id
+
+    fout.write(f"$version {os.path.basename(__file__)} $end\n")
+    fout.write(f"$timescale {timescale} $end\n")
+    fout.write(f"$scope module {scope} $end\n")
+    for i in keep:
+        name,width,id=names[i],widths[i],ids[i]
+        if width==1:
+            fout.write(f"$var wire 1 {id} {name} $end\n")
+        else:
+            fout.write(f"$var wire {width} {id} {name} [{width-1}:0] $end\n")
+    fout.write("$upscope $end\n$enddefinitions $end\n")
+
+    last=[None]*len(widths)
+    n=0
+    clock=0 #every data line is a clock, even the ones that get skipped
+    skipped=0
+    while line:
+        vals=line.split()
+        if len(vals)==len(widths):
+            if counter is not None and vals[counter]!=format(clock,f"0{widths[counter]}b"):
+                print(f"{names[counter]} on line {lineno} doesn't match the line count, it was dropped, rerun with --keep-counter to see it",file=sys.stderr)
+                counter=None
+            changes=[]
+            for i in keep:
+                v=vals[i]
+                if v!=last[i]:
+                    last[i]=v
+                    v=v.translate(value_map)
+                    if widths[i]==1:
+                        changes.append(f"{v}{ids[i]}\n")
+                    else:
+                        changes.append(f"b{compact(v)} {ids[i]}\n")
+            if n==0:
+                fout.write(f"#{clock*period}\n$dumpvars\n"+"".join(changes)+"$end\n")
+            elif changes:
+                fout.write(f"#{clock*period}\n"+"".join(changes))
+            n+=1
+        elif vals:
+            if skipped==0:
+                print(f"skipping line {lineno}, {len(vals)} columns instead of {len(widths)}, further bad lines are only counted",file=sys.stderr)
+            skipped+=1
+        if vals:
+            clock+=1
+        line=fin.readline()
+        lineno+=1
+    if skipped>0:
+        print(f"skipped {skipped} lines with the wrong number of columns",file=sys.stderr)
+        if skipped>n:
+            print(f"most lines were skipped, the column count comes from line {first_lineno} which is probably the bad one",file=sys.stderr)
+    fout.write(f"#{clock*period}\n")
+    return n
+
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="convert a testbench text dump to vcd, or fst if the output ends in .fst (needs gtkwave's vcd2fst)")
+    parser.add_argument("input",help="e.g. data/ram_tb.txt")
+    parser.add_argument("output",nargs="?",help="defaults to the input with .vcd")
+    parser.add_argument("--period",type=int,default=4,help="time per line in timescale units, tbs step 4 ns")
+    parser.add_argument("--timescale",default="1 ns")
+    parser.add_argument("--drop",nargs="+",default=[],help="columns to leave out")
+    parser.add_argument("--keep-counter",action="store_true",help=f"keep the {'/'.join(counter_names)} column, by default it's left out since it's just the time")
+    args=parser.parse_args()
+
+    output=args.output
+    if output is None:
+        output=os.path.splitext(args.input)[0]+".vcd"
+    scope=os.path.splitext(os.path.basename(args.input))[0]
+
+    fin=open(args.input)
+    if output.endswith(".fst"):
+        if shutil.which("vcd2fst") is None:
+            sys.exit("vcd2fst not found, install gtkwave or write .vcd")
+        #vcd goes through a pipe so the full vcd never hits the disk
+        proc=subprocess.Popen(["vcd2fst","-v","-","-f",output],stdin=subprocess.PIPE,text=True)
+        n=convert(fin,proc.stdin,args.period,args.timescale,scope,args.drop,args.keep_counter)
+        proc.stdin.close()
+        if proc.wait()!=0:
+            sys.exit(f"vcd2fst failed with {proc.returncode}")
+    else:
+        fout=open(output,"w")
+        n=convert(fin,fout,args.period,args.timescale,scope,args.drop,args.keep_counter)
+        fout.close()
+    fin.close()
+    print(f"wrote {n} clocks to {output}")
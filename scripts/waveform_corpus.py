@@ -0,0 +1,176 @@
+import numpy as np
+import os
+import argparse
+
+#memory mapped store of 24 channel events for replaying into the testbenches
+#a corpus is a directory holding two .npy files
+#   waveforms.npy : uint8 (n_events, n_channels, n_samples), adc counts with 128 as baseline
+#   index.npy     : one record per event, see index_dtype
+#both are opened with mmap so nothing is parsed, events are pulled straight off the disk
+
+n_channels=24
+n_samples=2048
+baseline=128
+
+index_dtype=np.dtype([
+    ("station",np.uint16),
+    ("time",np.float64), #unix time of the event
+    ("trigger_type",np.uint8), #see trigger_types
+    ("snr",np.float32),
+])
+
+#rno-g trigger names
+trigger_types={
+    "force":0,
+    "radiant0":1,
+    "radiant1":2,
+    "lt":3,
+    "pps":4,
+    "ext":5,
+}
+
+def _paths(path):
+    return os.path.join(path,"waveforms.npy"),os.path.join(path,"index.npy")
+
+def create_corpus(path,n_events,channels=n_channels,samples=n_samples):
+    """
+    make an empty corpus on disk with room for n_events, returns (index, waveforms) as writable memmaps.
+    waveforms start at baseline, fill them in with waveforms[i]=... and index[i]=... then call flush() on both
+    """
+    if samples%4!=0:
+        raise ValueError(f"samples has to be a multiple of 4 to pack into 32 bit words, got {samples}")
+    os.makedirs(path,exist_ok=True)
+    wave_path,index_path=_paths(path)
+    waveforms=np.lib.format.open_memmap(wave_path,mode="w+",dtype=np.uint8,shape=(n_events,channels,samples))
+    waveforms[:]=baseline
+    index=np.lib.format.open_memmap(index_path,mode="w+",dtype=index_dtype,shape=(n_events,))
+    return index,waveforms
+
+def open_corpus(path,mode="r"):
+    """
+    open an existing corpus, returns (index, waveforms) memmaps. waveforms[i] is random access to event i
+    """
+    wave_path,index_path=_paths(path)
+    waveforms=np.load(wave_path,mmap_mode=mode)
+    index=np.load(index_path,mmap_mode=mode)
+    if len(index)!=len(waveforms):
+        raise ValueError(f"corpus {path} has {len(index)} index entries but {len(waveforms)} events")
+    return index,waveforms
+
+def select(index,station=None,trigger_type=None,min_snr=None,max_snr=None,t_min=None,t_max=None):
+    """
+    event numbers matching all of the given cuts, station and trigger_type can be single values or lists.
+    trigger_type can be given by name (see trigger_types)
+    """
+    mask=np.ones(len(index),dtype=bool)
+    if station is not None:
+        mask&=np.isin(index["station"],np.atleast_1d(station))
+    if trigger_type is not None:
+        if not isinstance(trigger_type,(list,tuple,np.ndarray)):
+            trigger_type=[trigger_type]
+        codes=[trigger_types[t] if isinstance(t,str) else int(t) for t in trigger_type]
+        mask&=np.isin(index["trigger_type"],codes)
+    if min_snr is not None:
+        mask&=index["snr"]>=min_snr
+    if max_snr is not None:
+        mask&=index["snr"]<max_snr
+    if t_min is not None:
+        mask&=index["time"]>=t_min
+    if t_max is not None:
+        mask&=index["time"]<t_max
+    return np.flatnonzero(mask)
+
+def iter_events(path,chunk_size=1024,**cuts):
+    """
+    loop over the events passing the cuts (same keywords as select) in chunks of up to chunk_size events.
+    yields (index records, waveforms) with waveforms shaped (n, channels, samples)
+    """
+    index,waveforms=open_corpus(path)
+    events=select(index,**cuts)
+    for start in range(0,len(events),chunk_size):
+        ev=events[start:start+chunk_size]
+        #contiguous runs are a plain slice of the memmap, no fancy indexing copy
+        if ev[-1]-ev[0]==len(ev)-1:
+            yield index[ev[0]:ev[-1]+1],waveforms[ev[0]:ev[-1]+1]
+        else:
+            yield index[ev],waveforms[ev]
+
+def stimulus_bytes(waves):
+    """
+    turn (channels, samples) uint8 adc counts into the lines the testbenches read, as one bytes object
+    with no newline after the last line.
+    each line is one 32 bit word per channel holding 4 samples, earliest sample in the top byte
+    (order gets flipped going into vhdl modules, same as make_waveforms.py)
+    """
+    waves=np.asarray(waves,dtype=np.uint8)
+    channels,samples=waves.shape
+    if samples%4!=0:
+        raise ValueError(f"samples has to be a multiple of 4 to pack into 32 bit words, got {samples}")
+    words=samples//4
+    #the bits of 4 consecutive bytes msb first are exactly the 32 bit word written out in binary
+    bits=np.unpackbits(waves,axis=1).reshape(channels,words,32).transpose(1,0,2)
+    words_text=np.full((words,channels,33),ord(" "),dtype=np.uint8)
+    words_text[:,:,:32]=bits+ord("0")
+    text=np.empty((words,channels*33+1),dtype=np.uint8)
+    text[:,:-1]=words_text.reshape(words,channels*33)
+    text[:,-1]=ord("\n")
+    return text.tobytes()[:-1]
+
+def write_stimulus(f,waves):
+    """
+    write one event (channels, samples) or several (n, channels, samples) back to back to an open binary file,
+    in the format of data/input_waveforms.txt. no newline after the last line, the testbenches stop on it
+    """
+    waves=np.asarray(waves,dtype=np.uint8)
+    if waves.ndim==2:
+        waves=waves[None]
+    #one event at a time so memory doesn't grow with the number of events
+    for i,event in enumerate(waves):
+        if i>0:
+            f.write(b"\n")
+        f.write(stimulus_bytes(event))
+
+def import_text_traces(path,files,station=0,time=0.,trigger_type="force",snr=0.):
+    """
+    make a one event corpus from ch*_test_trace.txt style files, one file per channel, zero baseline.
+    traces are padded with baseline out to n_samples
+    """
+    index,waveforms=create_corpus(path,1,channels=len(files))
+    for ch,file in enumerate(files):
+        trace=np.loadtxt(file)[:n_samples]+baseline
+        waveforms[0,ch,:len(trace)]=np.clip(np.rint(trace),0,255)
+    index[0]=(station,time,trigger_types[trigger_type],snr)
+    index.flush()
+    waveforms.flush()
+    return index,waveforms
+
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="look at or replay a waveform corpus")
+    parser.add_argument("corpus")
+    parser.add_argument("--station",type=int,nargs="+")
+    parser.add_argument("--trigger-type",nargs="+",choices=list(trigger_types))
+    parser.add_argument("--min-snr",type=float)
+    parser.add_argument("--max-snr",type=float)
+    parser.add_argument("--t-min",type=float)
+    parser.add_argument("--t-max",type=float)
+    parser.add_argument("--channels",type=int,default=n_channels,help="write only the first N channels, 4 for the pa")
+    parser.add_argument("--chunk-size",type=int,default=1024)
+    parser.add_argument("-o","--output",help="stimulus file to write, only prints a summary if not given")
+    args=parser.parse_args()
+
+    cuts=dict(station=args.station,trigger_type=args.trigger_type,min_snr=args.min_snr,max_snr=args.max_snr,
+              t_min=args.t_min,t_max=args.t_max)
+    index,waveforms=open_corpus(args.corpus)
+    print(f"{len(index)} events, {waveforms.shape[1]} channels, {waveforms.shape[2]} samples")
+    print(f"{len(select(index,**cuts))} pass cuts")
+
+    if args.output is not None:
+        f=open(args.output,mode="wb")
+        n=0
+        for idx,waves in iter_events(args.corpus,chunk_size=args.chunk_size,**cuts):
+            if n>0:
+                f.write(b"\n")
+            write_stimulus(f,waves[:,:args.channels])
+            n+=len(idx)
+        f.close()
+        print(f"wrote {n} events to {args.output}")